@@ -1,18 +1,20 @@
 # streamlit_app.py
 # Inventory Dashboard — (MODIFIED: 2-column layout for persistent nav)
 import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
 from datetime import datetime
+import importlib.util
 import io
+import math
+import numpy as np
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
 import streamlit as st
 
-# Optional: OpenAI for AI chat
-try:
-    import openai
-except Exception:
-    openai = None
+# Optional: OpenAI for AI chat (imported on first question, see chat_completion)
+OPENAI_AVAILABLE = importlib.util.find_spec("openai") is not None
 
 # =============================================================================
 # PAGE CONFIGURATION & GLOBAL STYLES
@@ -42,12 +44,15 @@ border: 1px solid rgba(240, 240, 240, 0.5);
 LABEL_STYLE = f"color:{MUTED_TEXT}; font-weight:600; font-size:13px;"
 TITLE_STYLE = f"color:{DARK_TEXT}; font-weight:800; font-size:24px;"
 
-st.markdown(
-    f"""
+@st.cache_resource(show_spinner=False)
+def page_css():
+    # Formatted once per process. The block itself is still written on every rerun, since
+    # Streamlit removes any element a rerun does not re-emit
+    return f"""
     <style>
         .main {{ background: {PRIMARY_BG_GRADIENT}; }}
         .small-muted {{ color:#718b89; font-size:12px; }}
-        .card {{ {CARD_STYLE} }}
+        .card, [class*="st-key-card_"] {{ {CARD_STYLE} }}
         .chip {{
             display:flex;
             align-items:center;
@@ -72,114 +77,510 @@ st.markdown(
         .modebar {{ visibility:hidden; }}
         /* Hide helper link underlines in nav */
         .nav-link {{ text-decoration: none; color: inherit; }}
+        /* Non-dashboard pages: keep max-width to make tables readable */
+        .center-container {{ max-width: 1000px; margin: 0; padding-top: 0; }}
     </style>
-    """,
-    unsafe_allow_html=True,
-)
+    """
+
+st.markdown(page_css(), unsafe_allow_html=True)
 
 # =============================================================================
-# LOAD DATA (Unchanged)
+# LOAD DATA
 # =============================================================================
 DATA_DIR = "data"
+PRODUCTS_PATH = os.path.join(DATA_DIR, "products.csv")
+SALES_PATH = os.path.join(DATA_DIR, "sales.csv")
+SUPPLIERS_PATH = os.path.join(DATA_DIR, "suppliers.csv")
+
+# Fixed-width integer types for the cached dashboard state, decoded straight from the CSV instead
+# of inferred as int64. Timestamp stays text (pyarrow would otherwise parse it into dates); the
+# derived state parses it once. The editable copies use an untyped read (see load_tables)
+PRODUCTS_DTYPES = {"Product_ID": "int32", "Quantity": "int32", "MinStock": "int32"}
+SALES_DTYPES = {"Product_ID": "int32", "Qty": "int32", "Timestamp": "str"}
+
+def file_mtime(path):
+    try:
+        return os.path.getmtime(path)
+    except OSError:
+        return None
 
-def read_csv_clean(path):
+@st.cache_data(show_spinner=False)
+def read_csv_clean(path, mtime=None, dtype=None):
+    # mtime is only part of the cache key, so editing the file on disk invalidates the entry
     try:
-        df = pd.read_csv(path)
-        df.columns = [c.strip() for c in df.columns]
+        # Typed reads use pyarrow's multithreaded parser (it ships with streamlit) with the
+        # declared dtypes; the C engine with plain inference covers untyped reads, a missing
+        # pyarrow install, files the stricter pyarrow parser rejects and values that do not fit
+        # the declared dtypes
+        df = None
+        if dtype:
+            try:
+                df = pd.read_csv(path, engine="pyarrow", dtype=dtype)
+            except Exception:
+                pass
+        if df is None:
+            df = pd.read_csv(path)
+        df.columns = df.columns.str.strip()
         return df
     except Exception:
         return None
 
-products = read_csv_clean(os.path.join(DATA_DIR, "products.csv"))
-sales = read_csv_clean(os.path.join(DATA_DIR, "sales.csv"))
-suppliers = read_csv_clean(os.path.join(DATA_DIR, "suppliers.csv"))
-
 # =============================================================================
-# FALLBACK DEMO DATA (Unchanged)
+# FALLBACK DEMO DATA
 # =============================================================================
-if products is None:
-    products = pd.DataFrame({
-        "Product_ID": [101, 102, 103, 104, 105],
-        "SKU": ["IPH-15", "GS24", "MB-Air-M3", "LG-MSE", "AP-PR2"],
-        "Name": ["iPhone 15", "Galaxy S24", "MacBook Air M3", "Logitech Mouse", "AirPods Pro"],
-        "Category": ["Mobile", "Mobile", "Laptop", "Accessory", "Accessory"],
-        "Quantity": [12, 30, 5, 3, 20],
-        "MinStock": [15, 10, 8, 5, 10],
-        "UnitPrice": [999, 899, 1299, 29, 249],
-        "Supplier_ID": ["ACME", "GX", "ACME", "ACC", "ACME"],
-    })
-
-if suppliers is None:
-    suppliers = pd.DataFrame({
-        "Supplier_ID": ["ACME", "GX", "ACC"],
-        "Supplier_Name": ["ACME Distribution", "GX Mobile", "Accessory House"],
-        "Email": ["orders@acme.com", "gx@mobile.com", "hello@acc.com"],
-        "Phone": ["+1-555-0100", "+1-555-0111", "+1-555-0122"],
-    })
-
-if sales is None:
-    sales = pd.DataFrame({
-        "Sale_ID": ["S-1001", "S-1002", "S-1003", "S-1004"],
-        "Product_ID": [104, 101, 105, 102],
-        "Qty": [2, 1, 3, 5],
-        "UnitPrice": [29, 999, 249, 899],
-        "Timestamp": ["2025-01-10", "2025-02-01", "2025-02-15", "2025-03-12"],
-    })
+@st.cache_data(show_spinner=False)
+def load_tables(products_path, sales_path, suppliers_path, mtime_tuple, typed=True):
+    # typed=False reads every column with plain inference, as the editors and CSV downloads expect
+    products = read_csv_clean(products_path, mtime_tuple[0], PRODUCTS_DTYPES if typed else None)
+    sales = read_csv_clean(sales_path, mtime_tuple[1], SALES_DTYPES if typed else None)
+    suppliers = read_csv_clean(suppliers_path, mtime_tuple[2])
+
+    if products is None:
+        products = pd.DataFrame({
+            "Product_ID": [101, 102, 103, 104, 105],
+            "SKU": ["IPH-15", "GS24", "MB-Air-M3", "LG-MSE", "AP-PR2"],
+            "Name": ["iPhone 15", "Galaxy S24", "MacBook Air M3", "Logitech Mouse", "AirPods Pro"],
+            "Category": ["Mobile", "Mobile", "Laptop", "Accessory", "Accessory"],
+            "Quantity": [12, 30, 5, 3, 20],
+            "MinStock": [15, 10, 8, 5, 10],
+            "UnitPrice": [999, 899, 1299, 29, 249],
+            "Supplier_ID": ["ACME", "GX", "ACME", "ACC", "ACME"],
+        })
+
+    if suppliers is None:
+        suppliers = pd.DataFrame({
+            "Supplier_ID": ["ACME", "GX", "ACC"],
+            "Supplier_Name": ["ACME Distribution", "GX Mobile", "Accessory House"],
+            "Email": ["orders@acme.com", "gx@mobile.com", "hello@acc.com"],
+            "Phone": ["+1-555-0100", "+1-555-0111", "+1-555-0122"],
+        })
+
+    if sales is None:
+        sales = pd.DataFrame({
+            "Sale_ID": ["S-1001", "S-1002", "S-1003", "S-1004"],
+            "Product_ID": [104, 101, 105, 102],
+            "Qty": [2, 1, 3, 5],
+            "UnitPrice": [29, 999, 249, 899],
+            "Timestamp": ["2025-01-10", "2025-02-01", "2025-02-15", "2025-03-12"],
+        })
+
+    return products, sales, suppliers
+
+DATA_MTIMES = (file_mtime(PRODUCTS_PATH), file_mtime(SALES_PATH), file_mtime(SUPPLIERS_PATH))
 
 # =============================================================================
-# SESSION STATE FOR EDITS (Unchanged)
+# SESSION STATE FOR EDITS
 # =============================================================================
-if "products_edit" not in st.session_state:
-    st.session_state.products_edit = products.copy()
-if "suppliers_edit" not in st.session_state:
-    st.session_state.suppliers_edit = suppliers.copy()
-if "sales_edit" not in st.session_state:
-    st.session_state.sales_edit = sales.copy()
+# Only the first run of a session seeds the editable copies; later reruns skip unpickling the
+# cached frames altogether
+if not all(k in st.session_state for k in ("products_edit", "suppliers_edit", "sales_edit")):
+    products, sales, suppliers = load_tables(PRODUCTS_PATH, SALES_PATH, SUPPLIERS_PATH, DATA_MTIMES, typed=False)
+    if "products_edit" not in st.session_state:
+        st.session_state.products_edit = products
+    if "suppliers_edit" not in st.session_state:
+        st.session_state.suppliers_edit = suppliers
+    if "sales_edit" not in st.session_state:
+        st.session_state.sales_edit = sales
 
 # =============================================================================
-# DERIVED METRICS (Unchanged)
+# DERIVED METRICS (cached per data-file mtime)
 # =============================================================================
-products["StockValue"] = products["Quantity"] * products["UnitPrice"]
-low_stock_items_count = (products["Quantity"] < products["MinStock"]).sum()
-low_stock_qty_total = int(products.loc[products["Quantity"] < products["MinStock"], "Quantity"].sum())
-reorder_qty_total = int((products["MinStock"] - products["Quantity"]).clip(lower=0).sum())
-in_stock_qty_total = int(products["Quantity"].sum())
-
-supplier_totals = (
-    products.merge(suppliers, on="Supplier_ID", how="left")
-    .groupby("Supplier_Name", as_index=False)["StockValue"]
-    .sum()
-    .sort_values("StockValue", ascending=False)
-)
-
-sales_ext = sales.merge(products[["Product_ID", "Name", "Category", "SKU"]], on="Product_ID", how="left")
-sales_ext["Month"] = pd.to_datetime(sales_ext["Timestamp"]).dt.to_period("M").astype(str)
-sales_by_cat = sales_ext.groupby("Category", as_index=False)["Qty"].sum()
+# Columns the analyst prompt actually needs; everything else only costs tokens
+PREVIEW_COLS = {
+    "products": ["Product_ID", "SKU", "Name", "Category", "Quantity", "MinStock", "UnitPrice", "StockValue", "Supplier_ID"],
+    "sales": ["Product_ID", "Qty", "Timestamp"],
+    "suppliers": ["Supplier_ID", "Supplier_Name"],
+}
+
+def df_preview_text(df, limit=5, cols=None):
+    if cols is not None:
+        df = df[[c for c in cols if c in df.columns]]
+    preview = df.head(limit)
+    # Whole-number floats (e.g. float32 prices) print as "999" rather than "999.0"
+    for c in preview.select_dtypes("float").columns:
+        values = preview[c]
+        if values.notna().all() and (values % 1 == 0).all():
+            preview = preview.assign(**{c: pd.to_numeric(values.astype("int64"), downcast="integer")})
+    # The CSV header already names the columns, so they are not listed separately
+    return f"rows={len(df)}\npreview:\n{preview.to_csv(index=False)}"
+
+def df_rows(df):
+    return tuple(df.itertuples(index=False, name=None))
+
+def group_sum(df, keys, value):
+    # Same rows as df.groupby(keys, as_index=False, observed=True)[value].sum(), but via
+    # factorize + bincount, which skips groupby's per-call overhead on a handful of groups
+    codes = np.zeros(len(df), dtype=np.int64)
+    valid = np.ones(len(df), dtype=bool)
+    uniques = []
+    for k in keys:
+        k_codes, k_uniques = pd.factorize(df[k], sort=True)
+        valid &= k_codes >= 0
+        codes = codes * len(k_uniques) + k_codes
+        uniques.append(np.asarray(k_uniques))
+    shape = tuple(len(u) for u in uniques)
+    weights = np.nan_to_num(df[value].to_numpy(dtype="float64"))
+    counts = np.bincount(codes[valid], minlength=int(np.prod(shape)))
+    sums = np.bincount(codes[valid], weights=weights[valid], minlength=int(np.prod(shape)))
+    present = np.flatnonzero(counts)
+    out = {k: u[idx] for k, u, idx in zip(keys, uniques, np.unravel_index(present, shape))}
+    out[value] = sums[present].astype(np.int64) if df[value].dtype.kind in "iu" else sums[present]
+    return pd.DataFrame(out)
+
+def downcast(s, dtype):
+    # Blank cells parse as NaN, which int32 cannot hold; such columns keep their float dtype
+    return s if s.isna().any() else s.astype(dtype)
+
+def stock_kpis(qty, min_stock, unit_price):
+    # StockValue plus every stock KPI from the three column arrays. Columns with blank cells
+    # arrive as float with NaN; like pandas' skipna sums, those rows add nothing to the totals
+    # int32 * float32 would promote to float64; keep StockValue in float32 like UnitPrice
+    stock_value = qty.astype(np.float32) * unit_price
+    deficit = min_stock - qty
+    low_mask = deficit > 0  # same as qty < min_stock (False for NaN), reusing the deficit pass
+    return (
+        stock_value,
+        int(low_mask.sum()),
+        int(qty.sum(where=low_mask)),
+        int(deficit.sum(where=low_mask)),
+        int(np.nansum(qty)),
+        float(np.nansum(stock_value, dtype=np.float64)),
+    )
+
+@st.cache_data(show_spinner=False)
+def compact_tables(products_path, sales_path, suppliers_path, mtime_tuple):
+    products, sales, suppliers = load_tables(products_path, sales_path, suppliers_path, mtime_tuple)
+
+    # Compact dtypes (applied here, after the editable copies, so the editors keep free-text columns)
+    for c in ("Product_ID", "Quantity", "MinStock"):
+        products[c] = downcast(products[c], "int32")
+    products["UnitPrice"] = products["UnitPrice"].astype("float32")
+    for c in ("Supplier_ID", "Category", "Name", "SKU"):
+        products[c] = products[c].astype("category")
+    for c in ("Supplier_ID", "Supplier_Name"):
+        suppliers[c] = suppliers[c].astype("category")
+    sales["Product_ID"] = downcast(sales["Product_ID"], "int32")
+    if "Qty" in sales.columns:
+        sales["Qty"] = downcast(sales["Qty"], "int32")
+    return products, sales, suppliers
+
+@st.cache_data(show_spinner=False)
+def build_sales_ext(products_path, sales_path, suppliers_path, mtime_tuple):
+    products, sales, _ = compact_tables(products_path, sales_path, suppliers_path, mtime_tuple)
+    # products is a lookup table (one row per Product_ID): an index join avoids merge's alignment work
+    sales_ext = sales.join(products.set_index("Product_ID")[["Name", "Category", "SKU"]], on="Product_ID")
+    if "Qty" not in sales_ext.columns:
+        # One unit per sale row when the export has no quantity column
+        sales_ext["Qty"] = np.ones(len(sales_ext), dtype=np.int32)
+    if "Timestamp" in sales_ext.columns:
+        # utc=True so a mix of naive and offset timestamps parses instead of raising; months are
+        # then taken in UTC
+        timestamps = pd.to_datetime(sales_ext["Timestamp"], format="ISO8601", errors="coerce",
+                                    utc=True).dt.tz_convert(None)
+        # Month periods are integer-backed; only the distinct months get formatted as labels
+        codes, months = pd.factorize(timestamps.dt.to_period("M"), sort=True)
+        sales_ext["Month"] = pd.Categorical.from_codes(codes, categories=months.strftime("%Y-%m"))
+    else:
+        # Undated exports count as this month; formatted once rather than parsed per row
+        sales_ext["Month"] = pd.Categorical([datetime.now().strftime("%Y-%m")] * len(sales_ext))
+    return sales_ext
+
+@st.cache_data(show_spinner=False)
+def build_dashboard_state(products_path, sales_path, suppliers_path, mtime_tuple):
+    # Only scalars and the small per-supplier/per-category aggregates are returned, so a cache
+    # hit on every Dashboard rerun unpickles a few rows rather than the full tables
+    products, sales, suppliers = compact_tables(products_path, sales_path, suppliers_path, mtime_tuple)
+
+    (stock_value, low_stock_items_count, low_stock_qty_total,
+     reorder_qty_total, in_stock_qty_total, total_stock_value) = stock_kpis(
+        products["Quantity"].to_numpy(), products["MinStock"].to_numpy(), products["UnitPrice"].to_numpy())
+    products["StockValue"] = stock_value
+    sku_count = int(products["SKU"].nunique())
+
+    # Aggregate on the categorical Supplier_ID first, then label the few resulting rows,
+    # instead of joining supplier names onto every product
+    by_supplier = group_sum(products, ["Supplier_ID"], "StockValue")
+    supplier_names = suppliers.drop_duplicates("Supplier_ID").set_index("Supplier_ID")["Supplier_Name"]
+    supplier_totals = (
+        pd.DataFrame({
+            "Supplier_Name": by_supplier["Supplier_ID"].map(supplier_names).astype(object),
+            "StockValue": by_supplier["StockValue"],
+        })
+        .dropna(subset=["Supplier_Name"])
+        .sort_values("StockValue", ascending=False)
+    )
+
+    sales_ext = build_sales_ext(products_path, sales_path, suppliers_path, mtime_tuple)
+    sales_by_cat = group_sum(sales_ext, ["Category"], "Qty")
+    units_sold = int(sales_ext["Qty"].sum())
+
+    # The LLM prompt context only depends on the loaded data, so build it once here
+    llm_context = (
+        "You are a precise data analyst.\n"
+        f"[PRODUCTS]\n{df_preview_text(products, cols=PREVIEW_COLS['products'])}\n\n"
+        f"[SALES]\n{df_preview_text(sales, cols=PREVIEW_COLS['sales'])}\n\n"
+        f"[SUPPLIERS]\n{df_preview_text(suppliers, cols=PREVIEW_COLS['suppliers'])}"
+    )
+
+    return {
+        "llm_context": llm_context,
+        "supplier_count": len(suppliers),
+        "low_stock_items_count": low_stock_items_count,
+        "low_stock_qty_total": low_stock_qty_total,
+        "reorder_qty_total": reorder_qty_total,
+        "in_stock_qty_total": in_stock_qty_total,
+        "sku_count": sku_count,
+        "total_stock_value": total_stock_value,
+        "supplier_totals": supplier_totals,
+        "sales_by_cat": sales_by_cat,
+        "units_sold": units_sold,
+    }
+
+@st.cache_data(show_spinner=False)
+def build_trend_state(products_path, sales_path, suppliers_path, mtime_tuple):
+    # Only needed while the trend card is shown, so kept out of build_dashboard_state
+    sales_ext = build_sales_ext(products_path, sales_path, suppliers_path, mtime_tuple)
+    series_df = group_sum(sales_ext, ["Month", "Name"], "Qty")
+    # "YYYY-MM" labels sort chronologically as plain strings
+    months_sorted = sorted(series_df["Month"].unique())
+    return df_rows(series_df[["Month", "Name", "Qty"]]), tuple(months_sorted)
+
+@st.cache_data(show_spinner=False)
+def chat_state(products_path, sales_path, suppliers_path, mtime_tuple):
+    # What the chat views need (prompt context, greeting figure) without the cached frames
+    dash = build_dashboard_state(products_path, sales_path, suppliers_path, mtime_tuple)
+    return dash["llm_context"], float(dash["supplier_totals"].iloc[0]["StockValue"])
+
+def chat_context():
+    return chat_state(PRODUCTS_PATH, SALES_PATH, SUPPLIERS_PATH, DATA_MTIMES)[0]
+
+def default_chat_log():
+    top_value = chat_state(PRODUCTS_PATH, SALES_PATH, SUPPLIERS_PATH, DATA_MTIMES)[1]
+    return [
+        chat_entry("user", "Which supplier has the highest stock value?"),
+        chat_entry("bot", f"ACME Distribution has the highest stock value at ${top_value:,.0f}."),
+    ]
 
 # =============================================================================
-# HELPERS (Unchanged)
+# DASHBOARD HELPERS (GAUGES & CHARTS)
 # =============================================================================
+@st.cache_data(show_spinner=False)
 def gauge(title, value, subtitle, color, max_value):
-    fig = go.Figure(go.Indicator(
-        mode="gauge+number",
-        value=value,
-        title={"text": f"<b>{title}</b><br><span style='font-size:14px; color:{MUTED_TEXT};'>{subtitle}</span>"},
-        gauge={
-            "axis": {"range": [0, max(max_value, 1)], "tickwidth": 0},
-            "bar": {"color": color, "thickness": 0.5},
-            "steps": [{"range": [0, max(max_value, 1)], "color": "rgba(47,94,89,0.06)"}],
-        },
-        number={"font": {"size": 32, "color": DARK_TEXT}},
-    ))
-    fig.update_layout(margin=dict(l=6, r=6, t=30, b=6), paper_bgcolor="rgba(0,0,0,0)")
+    # Half-circle gauge as inline SVG: a few hundred bytes of HTML instead of a Plotly Indicator
+    # figure and its JS renderer, for the same look (track, coloured bar, big number)
+    frac = min(max(value, 0) / max(max_value, 1), 1.0)
+    end_x = 100 - 80 * math.cos(math.pi * frac)
+    end_y = 100 - 80 * math.sin(math.pi * frac)
+    bar = (f"<path d='M20 100 A80 80 0 0 1 {end_x:.2f} {end_y:.2f}' fill='none' stroke='{color}' stroke-width='20'/>"
+           if frac > 0 else "")
+    return (
+        f"<div style='text-align:center;'>"
+        f"<div style='color:{DARK_TEXT};'><b>{title}</b><br>"
+        f"<span style='font-size:14px; color:{MUTED_TEXT};'>{subtitle}</span></div>"
+        f"<svg viewBox='0 0 200 110' style='width:100%; max-width:220px;'>"
+        f"<path d='M20 100 A80 80 0 0 1 180 100' fill='none' stroke='rgba(47,94,89,0.06)' stroke-width='40'/>"
+        f"{bar}"
+        f"<text x='100' y='98' text-anchor='middle' font-size='32' fill='{DARK_TEXT}'>{value}</text>"
+        f"</svg></div>"
+    )
+
+# Figure builders are cached on plain (hashable) inputs and return the go.Figure itself:
+# st.plotly_chart only calls to_dict() on a Figure, while a plain dict would be rebuilt into a
+# Figure and validated again on every rerun. st.cache_resource hands back the same object
+# without a pickle round-trip; callers only read it.
+def plotly_go():
+    # Plotly is imported on the first chart build (Dashboard only), so other pages' cold
+    # starts skip it; later calls hit Python's module cache
+    import plotly.graph_objects as go
+    import plotly.io as pio
+
+    # Serialize chart JSON with orjson (C-accelerated) instead of the stdlib-based encoder
+    if importlib.util.find_spec("orjson") is not None:
+        pio.json.config.default_engine = "orjson"
+    return go
+
+def bar_fig(x, y, x_title, y_title, color, orientation="v"):
+    # go.Bar straight from arrays: same chart px.bar drew, without its DataFrame introspection
+    go = plotly_go()
+    fig = go.Figure(go.Bar(x=x, y=y, orientation=orientation, marker_color=color, name="", showlegend=False,
+                           hovertemplate=f"{x_title}=%{{x}}<br>{y_title}=%{{y}}<extra></extra>"))
+    fig.update_layout(xaxis_title=x_title, yaxis_title=y_title, barmode="relative", margin=dict(t=60))
     return fig
 
-def df_preview_text(df, limit=5):
-    cols = ", ".join(df.columns)
-    return f"rows={len(df)}, cols=[{cols}]\npreview:\n{df.head(limit).to_csv(index=False)}"
+@st.cache_resource(show_spinner=False, max_entries=64)
+def make_supplier_bar(names, values):
+    return bar_fig(np.asarray(values), np.asarray(names), "StockValue", "Supplier_Name",
+                   PRIMARY_COLOR, orientation="h")
+
+@st.cache_resource(show_spinner=False, max_entries=64)
+def make_category_bar(categories, qtys):
+    return bar_fig(np.asarray(categories), np.asarray(qtys), "Category", "Qty", ACCENT_COLOR)
+
+TREND_WEBGL_POINTS = 1000
+
+@st.cache_resource(show_spinner=False, max_entries=64)
+def make_trend(products_path, sales_path, suppliers_path, mtime_tuple):
+    # Keyed on paths + mtimes like the data builders, so a cache hit hashes four small values
+    # rather than every (month, product) row; the rows are only loaded on a miss
+    rows, months_sorted = build_trend_state(products_path, sales_path, suppliers_path, mtime_tuple)
+    series_df = pd.DataFrame(list(rows), columns=["Month", "Name", "Qty"])
+    months_sorted = list(months_sorted)
+    colors = ["#0077B6", "#FF9500", "#1EA97C", "#E74C3C"]
+    # One (month x product) matrix instead of filtering series_df once per product
+    pivot = (series_df.pivot(index="Month", columns="Name", values="Qty")
+             .reindex(index=months_sorted, columns=series_df["Name"].unique())
+             .fillna(0))
+    # Build every trace up front and hand them to a single Figure, instead of add_trace() per product
+    go = plotly_go()
+    # WebGL lines once the chart gets dense; SVG Scatter keeps small charts crisp
+    scatter = go.Scattergl if pivot.size > TREND_WEBGL_POINTS else go.Scatter
+    fig = go.Figure(data=[
+        scatter(x=months_sorted, y=pivot[label].to_numpy(), mode="lines+markers", name=label,
+                   line=dict(color=colors[i % len(colors)], width=3))
+        for i, label in enumerate(pivot.columns)
+    ])
+    fig.update_layout(paper_bgcolor="rgba(0,0,0,0)", plot_bgcolor="rgba(0,0,0,0)", margin=dict(l=6, r=6, t=8, b=6))
+    return fig
 
 # =============================================================================
-# ROUTING VIA QUERY PARAMS (Unchanged)
+# CHAT ASSISTANT (OPENAI CLIENT, ANSWER CACHE & CHAT PANEL)
+# =============================================================================
+@st.cache_resource(show_spinner=False)
+def get_openai_client(api_key):
+    # One client (and HTTP connection pool) per key, shared by every session and rerun
+    from openai import OpenAI
+
+    return OpenAI(api_key=api_key)
+
+ANSWER_TTL_SECONDS = 3600
+ANSWER_CACHE_MAX = 128
+
+@st.cache_resource(show_spinner=False)
+def answer_cache():
+    # {(context, query): (time answered, answer)} in least-recently-used order, shared across
+    # sessions (the lock guards it between their threads). Not st.cache_data, so answers can be
+    # streamed to the page while they are generated
+    return threading.Lock(), OrderedDict()
+
+def chat_completion(context, query, on_delta=None):
+    # Keyed on the full data context, so the same question against the same data reuses the
+    # previous answer; API errors raise and are therefore never cached
+    lock, cache = answer_cache()
+    key = (context, query)
+    with lock:
+        hit = cache.get(key)
+        if hit and time.monotonic() - hit[0] < ANSWER_TTL_SECONDS:
+            cache.move_to_end(key)
+            return hit[1]
+
+    client = get_openai_client(st.secrets["OPENAI_API_KEY"])
+    stream = client.chat.completions.create(
+        model="gpt-4o-mini",
+        messages=[
+            {"role": "system", "content": "Be concise and factual."},
+            {"role": "user", "content": f"{context}\n\nUser: {query}"},
+        ],
+        temperature=0.2,
+        max_tokens=400,
+        stream=True,
+    )
+    parts = []
+    for chunk in stream:
+        if chunk.choices and chunk.choices[0].delta.content:
+            parts.append(chunk.choices[0].delta.content)
+            if on_delta:
+                on_delta("".join(parts))
+    answer = "".join(parts).strip()
+    now = time.monotonic()
+    with lock:
+        cache[key] = (now, answer)
+        cache.move_to_end(key)
+        # Evict on insert: expired answers first, then the least recently used beyond the cap
+        for stale in [k for k, (t, _) in cache.items() if now - t >= ANSWER_TTL_SECONDS]:
+            del cache[stale]
+        while len(cache) > ANSWER_CACHE_MAX:
+            cache.popitem(last=False)
+    return answer
+
+# Chat bubbles are formatted once when a turn is added; reruns only join the stored HTML
+USER_TMPL = "<p style='text-align:right; font-size:13px; margin:4px 0;'>🧍‍♂️ <b>You:</b> {text}</p>"
+BOT_TMPL = (f"<p style='font-size:13px; background:#E8F4F3; color:{DARK_TEXT}; "
+            "padding:6px 10px; border-radius:8px; display:inline-block; margin:4px 0;'>🤖 {text}</p>")
+
+def chat_entry(role, text):
+    tmpl = USER_TMPL if role == "user" else BOT_TMPL
+    return (role, text, tmpl.format_map({"text": text}))
+
+def render_chat_messages():
+    return "".join(html for _, _, html in st.session_state.chat_log)
+
+def chat_card_html(title, messages_html):
+    return f"""
+    <div class="card" style="padding:18px; height:430px; display:flex; flex-direction:column;">
+        <div style="{TITLE_STYLE}; font-size:18px;">{title}</div>
+        <div class="small-muted" style="margin-bottom:8px;">Ask questions about inventory, suppliers, or sales.</div>
+        <hr style="margin:8px 0 10px 0;"/>
+        <div id="chat-container" style="flex-grow:1; overflow-y:auto; background:#f9fbfc;
+            border:1px solid #eef1f5; padding:10px 12px; border-radius:10px;
+            display:flex; flex-direction:column; justify-content:space-between;">
+            <div id="chat-messages">
+                {messages_html}
+            </div>
+        </div>
+    </div>
+    """
+
+def answer_query_llm(query, on_delta=None):
+    try:
+        if not (OPENAI_AVAILABLE and st.secrets.get("OPENAI_API_KEY")):
+            return "AI chat is disabled or missing API key."
+        return chat_completion(chat_context(), query, on_delta)
+    except Exception as e:
+        return f"⚠️ Error: {e}"
+
+@st.fragment
+def chat_panel(title, input_key):
+    # Shared by the Dashboard card and the Chat Assistant page. As a fragment, sending a
+    # question reruns only this panel, not the Dashboard's data, gauges and charts. The card is
+    # an st.empty() slot filled *after* the input is handled, so a new question and its
+    # streamed answer appear in the same run
+    if "chat_log" not in st.session_state:
+        st.session_state.chat_log = default_chat_log()
+    box = st.empty()
+    live = st.empty()  # the streaming answer's own bubble, so the history is not redrawn per token
+    prompt = st.chat_input("Type your question...", key=input_key)
+    if prompt and prompt.strip():
+        q = prompt.strip()
+        st.session_state.chat_log.append(chat_entry("user", q))
+        if not (OPENAI_AVAILABLE and st.secrets.get("OPENAI_API_KEY")):
+            ans = "AI chat is disabled: missing OpenAI package or API key."
+        else:
+            box.markdown(chat_card_html(title, render_chat_messages()), unsafe_allow_html=True)
+            with st.spinner("Analyzing data..."):
+                ans = answer_query_llm(q, on_delta=lambda text: live.markdown(
+                    BOT_TMPL.format_map({"text": text}), unsafe_allow_html=True))
+            live.empty()
+        st.session_state.chat_log.append(chat_entry("bot", ans))
+    box.markdown(chat_card_html(title, render_chat_messages()), unsafe_allow_html=True)
+
+# =============================================================================
+# LAYOUT HELPERS
+# =============================================================================
+@contextmanager
+def card(title, key, size=18):
+    # Keyed container styled as a card (CSS above), so the card really wraps its widgets and
+    # needs one markdown write for the title instead of separate open/close <div> writes
+    with st.container(key=f"card_{key}"):
+        st.markdown(f"<div style='{TITLE_STYLE}; font-size:{size}px;'>{title}</div>", unsafe_allow_html=True)
+        yield
+
+@st.cache_data(show_spinner=False, ttl=60)
+def updated_label():
+    # The snapshot card shows minutes, so the formatted clock is reused for up to a minute
+    return datetime.now().strftime('%b %d, %Y %H:%M')
+
+# =============================================================================
+# ROUTING VIA QUERY PARAMS
 # =============================================================================
 DEFAULT_PAGE = "Dashboard"
 qp = st.query_params
@@ -191,6 +592,26 @@ def _chip(label, icon, active):
     href = f"?page={label.replace(' ', '%20')}"
     return f"<a class='nav-link' href='{href}'><div class='chip {act}'>{icon} {label}</div></a>"
 
+NAV_ITEMS = (
+    ("Dashboard", "📊"),
+    ("Inventory", "📦"),
+    ("Suppliers", "🚚"),
+    ("Orders", "🛒"),
+    ("Chat Assistant", "💬"),
+    ("Settings", "⚙️"),
+)
+
+@st.cache_data(show_spinner=False)
+def nav_html(current_page):
+    # The whole nav card as one string, built once per page
+    chips = "".join(_chip(label, icon, label == current_page) for label, icon in NAV_ITEMS)
+    return (
+        f'<div class="card" style="padding:20px;">'
+        f'<div style="{TITLE_STYLE}; font-size:18px;">Navigation</div>'
+        f'<div style="display:flex; flex-direction:column; gap:8px; margin-top:10px;">{chips}</div>'
+        f'</div>'
+    )
+
 # =============================================================================
 # ---!!! MODIFICATION START: NEW 2-COLUMN LAYOUT !!!---
 # =============================================================================
@@ -202,19 +623,7 @@ nav_col, content_col = st.columns([0.8, 3.5], gap="large")
 
 # --- NAVIGATION (Now in nav_col)
 with nav_col:
-    st.markdown(f"""
-        <div class="card" style="padding:20px;">
-            <div style="{TITLE_STYLE}; font-size:18px;">Navigation</div>
-            <div style="display:flex; flex-direction:column; gap:8px; margin-top:10px;">
-                {_chip("Dashboard", "📊", current_page=="Dashboard")}
-                {_chip("Inventory", "📦", current_page=="Inventory")}
-                {_chip("Suppliers", "🚚", current_page=="Suppliers")}
-                {_chip("Orders", "🛒", current_page=="Orders")}
-                {_chip("Chat Assistant", "💬", current_page=="Chat Assistant")}
-                {_chip("Settings", "⚙️", current_page=="Settings")}
-            </div>
-        </div>
-    """, unsafe_allow_html=True)
+    st.markdown(nav_html(current_page), unsafe_allow_html=True)
 
 # --- ALL CONTENT (Now in content_col)
 # Everything below is indented to fit into the main content column
@@ -224,30 +633,45 @@ with content_col:
     # PAGE: DASHBOARD
     # =============================================================================
     if current_page == "Dashboard":
-        
+        # Dashboard-only state, so the other pages never unpickle the cached frames
+        dash = build_dashboard_state(PRODUCTS_PATH, SALES_PATH, SUPPLIERS_PATH, DATA_MTIMES)
+        supplier_count = dash["supplier_count"]
+        low_stock_items_count = dash["low_stock_items_count"]
+        low_stock_qty_total = dash["low_stock_qty_total"]
+        reorder_qty_total = dash["reorder_qty_total"]
+        in_stock_qty_total = dash["in_stock_qty_total"]
+        sku_count = dash["sku_count"]
+        total_stock_value = dash["total_stock_value"]
+        supplier_totals = dash["supplier_totals"]
+        sales_by_cat = dash["sales_by_cat"]
+        units_sold = dash["units_sold"]
+
         # --- Top Row (KPIs & Stats)
         # We re-create the 2-column split *inside* the content_col
         # Using [2.0, 1.5] from your original top_cols
         kpi_cols = st.columns([2.0, 1.5], gap="large")
 
         with kpi_cols[0]:
-            st.markdown(f"<div class='card'><div style='{TITLE_STYLE}; font-size:20px;'>Stock Overview</div>", unsafe_allow_html=True)
-            gcols = st.columns(3)
-            max_kpi = max(in_stock_qty_total, reorder_qty_total, low_stock_qty_total, 1)
-            gcols[0].plotly_chart(gauge("Low Stock", low_stock_qty_total, f"{low_stock_items_count} items", "#E74C3C", max_kpi), use_container_width=True)
-            gcols[1].plotly_chart(gauge("Reorder", reorder_qty_total, f"{reorder_qty_total} items", "#F39C12", max_kpi), use_container_width=True)
-            gcols[2].plotly_chart(gauge("In Stock", in_stock_qty_total, f"{in_stock_qty_total} items", ACCENT_COLOR, max_kpi), use_container_width=True)
-            st.markdown("</div>", unsafe_allow_html=True)
+            with card("Stock Overview", "stock", size=20):
+                gcols = st.columns(3)
+                max_kpi = max(in_stock_qty_total, reorder_qty_total, low_stock_qty_total, 1)
+                gauges = [
+                    gauge("Low Stock", low_stock_qty_total, f"{low_stock_items_count} items", "#E74C3C", max_kpi),
+                    gauge("Reorder", reorder_qty_total, f"{reorder_qty_total} items", "#F39C12", max_kpi),
+                    gauge("In Stock", in_stock_qty_total, f"{in_stock_qty_total} items", ACCENT_COLOR, max_kpi),
+                ]
+                for gcol, gauge_html in zip(gcols, gauges):
+                    gcol.markdown(gauge_html, unsafe_allow_html=True)
 
         with kpi_cols[1]:
             st.markdown(f"""
                 <div class="card" style="text-align:center;">
                     <div style="{LABEL_STYLE}">Quick Stats</div>
-                    <div style="font-size:32px; color:{DARK_TEXT}; font-weight:800;">{products['SKU'].nunique()} SKUs</div>
-                    <div class="small-muted">Total Stock Value: ${products['StockValue'].sum():,.0f}</div>
+                    <div style="font-size:32px; color:{DARK_TEXT}; font-weight:800;">{sku_count} SKUs</div>
+                    <div class="small-muted">Total Stock Value: ${total_stock_value:,.0f}</div>
                     <hr/>
                     <div style="{LABEL_STYLE}">Suppliers</div>
-                    <div style="font-size:24px; color:{DARK_TEXT}; font-weight:700;">{len(suppliers)} Active</div>
+                    <div style="font-size:24px; color:{DARK_TEXT}; font-weight:700;">{supplier_count} Active</div>
                 </div>
             """, unsafe_allow_html=True)
         
@@ -255,24 +679,26 @@ with content_col:
         mid_cols = st.columns([2.0, 1.3], gap="large")
 
         with mid_cols[0]:
-            st.markdown(f"<div class='card'><div style='{TITLE_STYLE}; font-size:18px;'>Supplier & Sales Data</div>", unsafe_allow_html=True)
-            subcols = st.columns(2)
-            subcols[0].plotly_chart(px.bar(supplier_totals, x="StockValue", y="Supplier_Name", orientation="h",
-                                            color_discrete_sequence=[PRIMARY_COLOR]), use_container_width=True)
-            subcols[1].plotly_chart(px.bar(sales_by_cat, x="Category", y="Qty", color_discrete_sequence=[ACCENT_COLOR]),
-                                    use_container_width=True)
-            st.markdown("</div>", unsafe_allow_html=True)
+            with card("Supplier & Sales Data", "supplier_sales"):
+                subcols = st.columns(2)
+                # Tuples, not object arrays: st.cache_resource hashes an object ndarray by its element
+                # pointers, which change on every unpickle, so the figures would never be reused
+                supplier_fig = make_supplier_bar(tuple(supplier_totals["Supplier_Name"].tolist()),
+                                                 tuple(supplier_totals["StockValue"].tolist()))
+                category_fig = make_category_bar(tuple(sales_by_cat["Category"].tolist()), tuple(sales_by_cat["Qty"].tolist()))
+                subcols[0].plotly_chart(supplier_fig, use_container_width=True)
+                subcols[1].plotly_chart(category_fig, use_container_width=True)
 
         with mid_cols[1]:
             st.markdown(f"""
                 <div class="card">
                     <div style="{TITLE_STYLE}; font-size:18px;">Data Snapshot</div>
-                    <div class="small-muted">Updated: {datetime.now().strftime('%b %d, %Y %H:%M')}</div>
+                    <div class="small-muted">Updated: {updated_label()}</div>
                     <hr/>
                     <ul style="font-size:14px; color:{DARK_TEXT}; line-height:1.6;">
                         <li>{low_stock_items_count} products below min stock</li>
-                        <li>{len(suppliers)} active suppliers</li>
-                        <li>{int(sales_ext['Qty'].sum()):,} units sold YTD</li>
+                        <li>{supplier_count} active suppliers</li>
+                        <li>{units_sold:,} units sold YTD</li>
                     </ul>
                 </div>
             """, unsafe_allow_html=True)
@@ -280,247 +706,61 @@ with content_col:
         # --- Bottom Row (Chat & Trend)
         bot_cols = st.columns([1.1, 2.3], gap="large")
 
-        # --- AI Answer Function (Local to Dashboard Chat)
-        def answer_query_llm(query):
-            try:
-                prod_ctx = df_preview_text(products)
-                sales_ctx = df_preview_text(sales)
-                supp_ctx = df_preview_text(suppliers)
-                context = (
-                    "You are a precise data analyst.\n"
-                    f"[PRODUCTS]\n{prod_ctx}\n\n[SALES]\n{sales_ctx}\n\n[SUPPLIERS]\n{supp_ctx}"
-                )
-
-                if not (openai and st.secrets.get("OPENAI_API_KEY")):
-                    return "AI chat is disabled or missing API key."
-
-                openai.api_key = st.secrets["OPENAI_API_KEY"]
-
-                resp = openai.chat.completions.create(
-                    model="gpt-4o-mini",
-                    messages=[
-                        {"role": "system", "content": "Be concise and factual."},
-                        {"role": "user", "content": f"{context}\n\nUser: {query}"},
-                    ],
-                    temperature=0.2,
-                    max_tokens=400,
-                )
-                return resp.choices[0].message.content.strip()
-
-            except Exception as e:
-                return f"⚠️ Error: {e}"
-
-        OPENAI_KEY = st.secrets.get("OPENAI_API_KEY", None)
-        if openai and OPENAI_KEY:
-            openai.api_key = OPENAI_KEY
-
-        if "chat_log" not in st.session_state:
-            st.session_state.chat_log = [
-                ("user", "Which supplier has the highest stock value?"),
-                ("bot", f"ACME Distribution has the highest stock value at ${supplier_totals.iloc[0]['StockValue']:,.0f}."),
-            ]
-
-        def render_chat_messages():
-            html = []
-            for role, text in st.session_state.chat_log:
-                if role == "user":
-                    html.append(f"<p style='text-align:right; font-size:13px; margin:4px 0;'>🧍‍♂️ <b>You:</b> {text}</p>")
-                else:
-                    html.append(f"<p style='font-size:13px; background:#E8F4F3; color:{DARK_TEXT}; "
-                                f"padding:6px 10px; border-radius:8px; display:inline-block; margin:4px 0;'>🤖 {text}</p>")
-            return "\n".join(html)
-
         # --- CHAT CARD
         with bot_cols[0]:
-            # This logic places the chat box *inside* the card, and the form *below* it
-            chat_html = f"""
-            <div class="card" style="padding:18px; height:430px; display:flex; flex-direction:column;">
-                <div style="{TITLE_STYLE}; font-size:18px;">Chat Assistant</div>
-                <div class="small-muted" style="margin-bottom:8px;">Ask questions about inventory, suppliers, or sales.</div>
-                <hr style="margin:8px 0 10px 0;"/>
-                <div id="chat-container" style="flex-grow:1; overflow-y:auto; background:#f9fbfc;
-                    border:1px solid #eef1f5; padding:10px 12px; border-radius:10px;
-                    display:flex; flex-direction:column; justify-content:space-between;">
-                    <div id="chat-messages">
-                        {render_chat_messages()}
-                    </div>
-                </div>
-            </div>
-            """
-            st.markdown(chat_html, unsafe_allow_html=True)
-
-            with st.form("chat_form", clear_on_submit=True):
-                cols = st.columns([0.8, 0.2])
-                with cols[0]:
-                    user_q = st.text_input("", placeholder="Type your question...", label_visibility="collapsed", key="chat_input")
-                with cols[1]:
-                    send = st.form_submit_button("Send")
-
-            if send and user_q.strip():
-                q = user_q.strip()
-                st.session_state.chat_log.append(("user", q))
-                if not (openai and OPENAI_KEY):
-                    ans = "AI chat is disabled: missing OpenAI package or API key."
-                else:
-                    with st.spinner("Analyzing data..."):
-                        ans = answer_query_llm(q)
-                st.session_state.chat_log.append(("bot", ans))
-                st.rerun()
+            # Chat box inside the card, question input below it
+            chat_panel("Chat Assistant", "chat_input")
 
         # --- TREND PERFORMANCE
         with bot_cols[1]:
-            st.markdown(f"<div class='card'><div style='{TITLE_STYLE}; font-size:18px;'>Trend Performance</div>", unsafe_allow_html=True)
-            name_col = "Name"
-            qty_col = "Qty"
-            series_df = sales_ext.groupby(["Month", name_col], as_index=False)[qty_col].sum()
-            months_sorted = sorted(series_df["Month"].unique(), key=lambda x: pd.to_datetime(x))
-            fig = go.Figure()
-            colors = ["#0077B6", "#FF9500", "#1EA97C", "#E74C3C"]
-            for i, label in enumerate(series_df[name_col].unique()):
-                sub = series_df[series_df[name_col] == label].set_index("Month").reindex(months_sorted).fillna(0)
-                fig.add_trace(go.Scatter(x=months_sorted, y=sub[qty_col], mode="lines+markers", name=label,
-                                         line=dict(color=colors[i % len(colors)], width=3)))
-            fig.update_layout(paper_bgcolor="rgba(0,0,0,0)", plot_bgcolor="rgba(0,0,0,0)", margin=dict(l=6, r=6, t=8, b=6))
-            st.plotly_chart(fig, use_container_width=True, config={"displayModeBar": False})
-            st.markdown("</div>", unsafe_allow_html=True)
+            with card("Trend Performance", "trend"):
+                if st.checkbox("Show trend", value=True, key="show_trend"):
+                    trend_fig = make_trend(PRODUCTS_PATH, SALES_PATH, SUPPLIERS_PATH, DATA_MTIMES)
+                    st.plotly_chart(trend_fig, use_container_width=True, config={"displayModeBar": False})
 
     # =============================================================================
     # OTHER PAGES (Now inside content_col)
     # =============================================================================
     
-    # AI Answer Function (Copied for the dedicated Chat page)
-    def answer_query_llm_page(query):
-        try:
-            prod_ctx = df_preview_text(products)
-            sales_ctx = df_preview_text(sales)
-            supp_ctx = df_preview_text(suppliers)
-            context = (
-                "You are a precise data analyst.\n"
-                f"[PRODUCTS]\n{prod_ctx}\n\n[SALES]\n{sales_ctx}\n\n[SUPPLIERS]\n{supp_ctx}"
-            )
-            if not (openai and st.secrets.get("OPENAI_API_KEY")):
-                return "AI chat is disabled or missing API key."
-            openai.api_key = st.secrets["OPENAI_API_KEY"]
-            resp = openai.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {"role": "system", "content": "Be concise and factual."},
-                    {"role": "user", "content": f"{context}\n\nUser: {query}"},
-                ],
-                temperature=0.2,
-                max_tokens=400,
-            )
-            return resp.choices[0].message.content.strip()
-        except Exception as e:
-            return f"⚠️ Error: {e}"
-
     # Download helper
     def _download_csv_button(df: pd.DataFrame, label: str, filename: str):
-        df = df.copy()
         csv_bytes = df.to_csv(index=False).encode("utf-8")
         st.download_button(label=label, data=csv_bytes, file_name=filename, mime="text/csv")
 
 
     # --- This block now renders at the top of content_col, next to the nav ---
     if current_page != "Dashboard":
-        st.markdown(
-            """
-            <style>
-            .center-container {
-                /* We keep max-width to make tables readable */
-                max-width: 1000px; 
-                margin: 0; /* Changed from '0 auto' to '0' */
-                padding-top: 0; /* Changed from '10px' to '0' */
-            }
-            </style>
-            """,
-            unsafe_allow_html=True,
-        )
-
         with st.container():
             st.markdown("<div class='center-container'>", unsafe_allow_html=True)
 
             # === INVENTORY ===
             if current_page == "Inventory":
-                st.markdown(f"<div class='card'><div style='{TITLE_STYLE}; font-size:18px;'>📦 Inventory (Editable)</div>", unsafe_allow_html=True)
-                edited = st.data_editor(st.session_state.products_edit, num_rows="dynamic", use_container_width=True)
-                st.session_state.products_edit = edited
-                st.markdown("</div>", unsafe_allow_html=True)
+                with card("📦 Inventory (Editable)", "inventory"):
+                    edited = st.data_editor(st.session_state.products_edit, num_rows="dynamic", use_container_width=True)
+                    st.session_state.products_edit = edited
 
             # === SUPPLIERS ===
             elif current_page == "Suppliers":
-                st.markdown(f"<div class='card'><div style='{TITLE_STYLE}; font-size:18px;'>🚚 Suppliers (Editable)</div>", unsafe_allow_html=True)
-                edited = st.data_editor(st.session_state.suppliers_edit, num_rows="dynamic", use_container_width=True)
-                st.session_state.suppliers_edit = edited
-                st.markdown("</div>", unsafe_allow_html=True)
+                with card("🚚 Suppliers (Editable)", "suppliers"):
+                    edited = st.data_editor(st.session_state.suppliers_edit, num_rows="dynamic", use_container_width=True)
+                    st.session_state.suppliers_edit = edited
 
             # === ORDERS ===
             elif current_page == "Orders":
-                st.markdown(f"<div class='card'><div style='{TITLE_STYLE}; font-size:18px;'>🛒 Orders / Sales (Editable)</div>", unsafe_allow_html=True)
-                edited = st.data_editor(st.session_state.sales_edit, num_rows="dynamic", use_container_width=True)
-                st.session_state.sales_edit = edited
-                st.markdown("</div>", unsafe_allow_html=True)
+                with card("🛒 Orders / Sales (Editable)", "orders"):
+                    edited = st.data_editor(st.session_state.sales_edit, num_rows="dynamic", use_container_width=True)
+                    st.session_state.sales_edit = edited
 
             # === CHAT ASSISTANT ===
             elif current_page == "Chat Assistant":
-                if "chat_log" not in st.session_state:
-                    st.session_state.chat_log = [
-                        ("user", "Which supplier has the highest stock value?"),
-                        ("bot", f"ACME Distribution has the highest stock value at ${supplier_totals.iloc[0]['StockValue']:,.0f}."),
-                    ]
-
-                def render_chat_messages_page():
-                    html = []
-                    for role, text in st.session_state.chat_log:
-                        if role == "user":
-                            html.append(f"<p style='text-align:right; font-size:13px; margin:4px 0;'>🧍‍♂️ <b>You:</b> {text}</p>")
-                        else:
-                            html.append(f"<p style='font-size:13px; background:#E8F4F3; color:{DARK_TEXT}; "
-                                        f"padding:6px 10px; border-radius:8px; display:inline-block; margin:4px 0;'>🤖 {text}</p>")
-                    return "\n".join(html)
-
-                st.markdown(f"""
-                    <div class="card" style="padding:18px; height:430px; display:flex; flex-direction:column;">
-                        <div style="{TITLE_STYLE}; font-size:18px;">💬 Chat Assistant</div>
-                        <div class="small-muted" style="margin-bottom:8px;">Ask questions about inventory, suppliers, or sales.</div>
-                        <hr style="margin:8px 0 10px 0;"/>
-                        <div id="chat-container" style="flex-grow:1; overflow-y:auto; background:#f9fbfc;
-                            border:1px solid #eef1f5; padding:10px 12px; border-radius:10px;
-                            display:flex; flex-direction:column; justify-content:space-between;">
-                            <div id="chat-messages">
-                                {render_chat_messages_page()}
-                            </div>
-                        </div>
-                    </div>
-                """, unsafe_allow_html=True)
-
-                with st.form("chat_form_page", clear_on_submit=True):
-                    cols = st.columns([0.8, 0.2])
-                    user_q = cols[0].text_input("", placeholder="Type your question...", label_visibility="collapsed")
-                    send = cols[1].form_submit_button("Send")
-
-                OPENAI_KEY = st.secrets.get("OPENAI_API_KEY", None)
-                if openai and OPENAI_KEY:
-                    openai.api_key = OPENAI_KEY
-
-                if send and user_q.strip():
-                    q = user_q.strip()
-                    st.session_state.chat_log.append(("user", q))
-                    if not (openai and OPENAI_KEY):
-                        ans = "AI chat is disabled: missing OpenAI package or API key."
-                    else:
-                        with st.spinner("Analyzing data..."):
-                            ans = answer_query_llm_page(q)
-                    st.session_state.chat_log.append(("bot", ans))
-                    st.rerun()
+                chat_panel("💬 Chat Assistant", "chat_input_page")
 
             # === SETTINGS ===
             elif current_page == "Settings":
-                st.markdown(f"<div class='card'><div style='{TITLE_STYLE}; font-size:18px;'>⚙️ Settings</div>", unsafe_allow_html=True)
-                st.write("Download your edited tables as CSV:")
-                _download_csv_button(st.session_state.products_edit, "⬇️ Download Inventory (CSV)", "inventory_edited.csv")
-                _download_csv_button(st.session_state.suppliers_edit, "⬇️ Download Suppliers (CSV)", "suppliers_edited.csv")
-                _download_csv_button(st.session_state.sales_edit, "⬇️ Download Orders (CSV)", "orders_edited.csv")
-                st.markdown("</div>", unsafe_allow_html=True)
+                with card("⚙️ Settings", "settings"):
+                    st.write("Download your edited tables as CSV:")
+                    _download_csv_button(st.session_state.products_edit, "⬇️ Download Inventory (CSV)", "inventory_edited.csv")
+                    _download_csv_button(st.session_state.suppliers_edit, "⬇️ Download Suppliers (CSV)", "suppliers_edited.csv")
+                    _download_csv_button(st.session_state.sales_edit, "⬇️ Download Orders (CSV)", "orders_edited.csv")
 
             st.markdown("</div>", unsafe_allow_html=True)